@@ -6,12 +6,19 @@ import json
 import uuid
 import zipfile
 from io import BytesIO
-from werkzeug.security import generate_password_hash, check_password_hash
 import smtplib
 import random
+import multiprocessing
+import threading
+import time
 from email.message import EmailMessage
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from werkzeug.middleware.proxy_fix import ProxyFix
 from dotenv import load_dotenv # Import load_dotenv
 from supabase import create_client, Client # Import Supabase client
+from rate_limiter import rate_limit
+from password_hashing import hash_password, verify_password, HashingBusyError
 
 # Load environment variables from .env file
 load_dotenv()
@@ -58,6 +65,13 @@ def calculate_match_score(job_description_text, required_skills, resume_processe
 app = Flask(__name__, static_folder='static', template_folder='templates')
 CORS(app)
 
+# Number of reverse proxies in front of the app (e.g. 1 for the Render/Heroku router,
+# 2 with a CDN in front of that). ProxyFix uses it to set request.remote_addr to the real
+# client IP, which the auth rate limits key on. Set to 0 when serving without a proxy.
+TRUSTED_PROXY_HOPS = int(os.environ.get("TRUSTED_PROXY_HOPS", 1))
+if TRUSTED_PROXY_HOPS > 0:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXY_HOPS)
+
 # ✅ Route to serve your frontend HTML
 @app.route('/')
 def home():
@@ -86,6 +100,9 @@ except Exception as e:
 resumes_db = {}  # Stores processed resume data and original file path
 screening_results_db = {}  # Stores results of the *last* screening operation
 job_requirements_db = {} # Stores job requirements temporarily for the current session
+# Guards multi-step reads/updates of the dbs above. Views can run concurrently on threads
+# (asgi.py), so e.g. the dashboard must never see a half-rebuilt screening_results_db.
+session_data_lock = threading.Lock()
 
 # --- Configuration ---
 UPLOAD_FOLDER = 'uploads'
@@ -93,6 +110,46 @@ if not os.path.exists(UPLOAD_FOLDER):
     os.makedirs(UPLOAD_FOLDER)
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 
+# Auth rate limits: (requests, per seconds), applied separately per client IP and per email
+LOGIN_RATE_LIMIT = (10, 60)
+SIGNUP_RATE_LIMIT = (5, 600)
+FORGOT_PASSWORD_RATE_LIMIT = (3, 600)
+
+# --- Background Executors ---
+# OTP emails are sent off the request thread so signup/forgot_password don't wait on SMTP
+email_executor = ThreadPoolExecutor(max_workers=int(os.environ.get("EMAIL_WORKERS", 4)),
+                                    thread_name_prefix="otp-email")
+# Set SCORING_PROCESSES > 0 to run match scoring in worker processes, keeping CPU-bound
+# work off the request threads (recommended with the async serving mode in asgi.py)
+SCORING_PROCESSES = int(os.environ.get("SCORING_PROCESSES", 0))
+scoring_executor_lock = threading.Lock()
+
+
+def create_scoring_executor():
+    # forkserver: scoring workers are forked from a clean server process rather than from a
+    # process running request threads, where a lock held by another thread (e.g. stdout's)
+    # could be copied into the child in its locked state and deadlock it
+    return ProcessPoolExecutor(max_workers=SCORING_PROCESSES,
+                               mp_context=multiprocessing.get_context('forkserver'))
+
+
+scoring_executor = create_scoring_executor() if SCORING_PROCESSES > 0 else None
+
+
+def replace_broken_scoring_executor(broken_executor):
+    # Several request threads can see the same broken pool; only the first one replaces it
+    global scoring_executor
+    with scoring_executor_lock:
+        if scoring_executor is broken_executor:
+            broken_executor.shutdown(wait=False, cancel_futures=True)
+            scoring_executor = create_scoring_executor()
+
+
+def shutdown_executors():
+    email_executor.shutdown(wait=True)
+    if scoring_executor:
+        scoring_executor.shutdown(wait=True)
+
 
 # --- Helper Functions ---
 def generate_id():
@@ -131,9 +188,36 @@ def send_otp_email(to_email, otp):
         # and potentially notify an administrator.
 
 
+def send_otp_email_in_background(to_email, otp):
+    # send_otp_email handles its own errors, so the future is not awaited
+    email_executor.submit(send_otp_email, to_email, otp)
+
+
+def score_resumes(job_description_text, required_skills, resume_entries):
+    # Returns (match_score, matched_skills) for each resume entry, in order
+    texts = [entry['processed_text'] for entry in resume_entries]
+    skills = [entry['extracted_skills'] for entry in resume_entries]
+    executor = scoring_executor
+    if executor and len(resume_entries) > 1:
+        chunksize = max(1, len(resume_entries) // (SCORING_PROCESSES * 4))
+        try:
+            return list(executor.map(
+                calculate_match_score,
+                [job_description_text] * len(texts), [required_skills] * len(texts), texts, skills,
+                chunksize=chunksize
+            ))
+        except BrokenProcessPool as e:
+            # A scoring worker died; start a fresh pool for later requests and score this one in-process
+            print(f"Scoring process pool broke ({e}); restarting it and scoring in-process.")
+            replace_broken_scoring_executor(executor)
+    return [calculate_match_score(job_description_text, required_skills, text, skill_list)
+            for text, skill_list in zip(texts, skills)]
+
+
 # --- API Endpoints ---
 
 @app.route('/api/signup', methods=['POST'])
+@rate_limit('signup', *SIGNUP_RATE_LIMIT)
 def signup():
     data = request.json
     email = data.get('email')
@@ -159,11 +243,11 @@ def signup():
                 otp = generate_otp()
                 # Update OTP in Supabase
                 supabase.table('users').update({'otp': otp}).eq('email', email).execute()
-                send_otp_email(email, otp)
+                send_otp_email_in_background(email, otp)
                 return jsonify(
                     {"message": "User exists but not verified. OTP resent for email verification.", "user_id": existing_user['id']}), 200
 
-        hashed_password = generate_password_hash(password)
+        hashed_password = hash_password(password)
         otp = generate_otp()
 
         # Insert new user into Supabase 'users' table
@@ -179,11 +263,14 @@ def signup():
         if response.data:
             user_id = response.data[0]['id']
             print(f"User {email} registered with ID {user_id} in Supabase.")
-            send_otp_email(email, otp)
+            send_otp_email_in_background(email, otp)
             return jsonify({"message": "User registered successfully. OTP sent for email verification.", "user_id": user_id}), 201
         else:
             return jsonify({"message": "Failed to register user."}), 500
 
+    except HashingBusyError as e:
+        print(f"Password hashing unavailable during signup: {e}")
+        return jsonify({"message": "Server is busy. Please try again shortly."}), 503
     except Exception as e:
         import traceback
         print(f"Supabase signup error: {e}")
@@ -192,6 +279,7 @@ def signup():
 
 
 @app.route('/api/login', methods=['POST'])
+@rate_limit('login', *LOGIN_RATE_LIMIT)
 def login():
     data = request.json
     email = data.get('email')
@@ -207,7 +295,7 @@ def login():
         response = supabase.table('users').select('*').eq('email', email).execute()
         user = response.data[0] if response.data else None
 
-        if not user or not check_password_hash(user['password_hash'], password):
+        if not user or not verify_password(user['password_hash'], password):
             return jsonify({"message": "Invalid email or password"}), 401
 
         if not user.get('is_verified'):
@@ -229,6 +317,9 @@ def login():
             "position": user.get('position')
         }), 200
 
+    except HashingBusyError as e:
+        print(f"Password hashing unavailable during login: {e}")
+        return jsonify({"message": "Server is busy. Please try again shortly."}), 503
     except Exception as e:
         print(f"Supabase login error: {e}")
         return jsonify({"message": f"An error occurred during login: {str(e)}"}), 500
@@ -282,6 +373,7 @@ def verify_otp():
 
 
 @app.route('/api/forgot_password', methods=['POST'])
+@rate_limit('forgot_password', *FORGOT_PASSWORD_RATE_LIMIT)
 def forgot_password():
     data = request.json
     email = data.get('email')
@@ -300,7 +392,7 @@ def forgot_password():
         # Store OTP in Supabase for the user
         supabase.table('users').update({'otp': otp}).eq('email', email).execute()
 
-        send_otp_email(email, otp)
+        send_otp_email_in_background(email, otp)
         print(f"Demo OTP for password reset for {email}: {otp}")
         return jsonify({"message": "OTP sent to your email for password reset"}), 200
 
@@ -325,12 +417,15 @@ def reset_password():
         if not user:
             return jsonify({"message": "User not found"}), 404
 
-        hashed_new_password = generate_password_hash(new_password)
+        hashed_new_password = hash_password(new_password)
         # Update password_hash in Supabase
         supabase.table('users').update({'password_hash': hashed_new_password, 'otp': None}).eq('email', email).execute()
 
         return jsonify({"message": "Password reset successfully"}), 200
 
+    except HashingBusyError as e:
+        print(f"Password hashing unavailable during password reset: {e}")
+        return jsonify({"message": "Server is busy. Please try again shortly."}), 503
     except Exception as e:
         print(f"Supabase reset password error: {e}")
         return jsonify({"message": f"An error occurred during password reset: {str(e)}"}), 500
@@ -438,8 +533,10 @@ def screen_resumes():
     job_id = data.get('job_id')
     resume_ids = data.get('resume_ids')
 
-    # Fetch job requirements from in-memory storage
-    job_req = job_requirements_db.get(job_id)
+    with session_data_lock:
+        # Fetch job requirements from in-memory storage
+        job_req = job_requirements_db.get(job_id)
+        resume_entries = [(resume_id, resumes_db[resume_id]) for resume_id in resume_ids if resume_id in resumes_db]
 
     if not job_req:
         return jsonify({"message": "Job requirements not found or session expired. Please re-enter job details."}), 404
@@ -449,22 +546,14 @@ def screen_resumes():
     required_department = job_req['department']
 
     results = []
-    screening_results_db.clear() # Clear previous screening results
+    new_screening_results = {}
 
-    for resume_id in resume_ids:
-        if resume_id not in resumes_db:
-            continue
+    # Scoring runs outside the lock; only the final swap of results is serialized
+    scores = score_resumes(job_description_text, required_skills,
+                           [resume_data for _, resume_data in resume_entries])
 
-        resume_data = resumes_db[resume_id]
+    for (resume_id, resume_data), (match_score, matched_skills) in zip(resume_entries, scores):
         resume_processed_text = resume_data['processed_text']
-        resume_extracted_skills = resume_data['extracted_skills']
-
-        match_score, matched_skills = calculate_match_score(
-            job_description_text,
-            required_skills,
-            resume_processed_text,
-            resume_extracted_skills
-        )
 
         department_match_factor = 1.0
         # Check if required_department is present in the resume's processed text
@@ -474,7 +563,7 @@ def screen_resumes():
         final_score = int(match_score * department_match_factor)
         final_score = min(final_score, 100) # Cap score at 100
 
-        screening_results_db[resume_id] = {
+        new_screening_results[resume_id] = {
             'job_id': job_id,
             'resume_id': resume_id,
             'filename': resume_data['filename'],
@@ -483,14 +572,20 @@ def screen_resumes():
             'matched_skills': matched_skills,
             'department': required_department # Include department in results for display
         }
-        results.append(screening_results_db[resume_id])
+        results.append(new_screening_results[resume_id])
+
+    # Replace the previous screening results in one step (the last screening wins, as before)
+    with session_data_lock:
+        screening_results_db.clear()
+        screening_results_db.update(new_screening_results)
 
     return jsonify({"message": "Screening complete", "results": results}), 200
 
 
 @app.route('/api/dashboard_data', methods=['GET'])
 def get_dashboard_data():
-    results = list(screening_results_db.values())
+    with session_data_lock:
+        results = list(screening_results_db.values())
 
     sort_by = request.args.get('sort_by', 'score')
     if sort_by == 'score':
@@ -514,17 +609,18 @@ def get_dashboard_data():
 
 @app.route('/api/resume_raw_text/<resume_id>', methods=['GET'])
 def get_resume_raw_text(resume_id):
-    if resume_id in resumes_db:
-        return jsonify({"raw_text": resumes_db[resume_id]['raw_text']}), 200
+    resume_data = resumes_db.get(resume_id)
+    if resume_data:
+        return jsonify({"raw_text": resume_data['raw_text']}), 200
     return jsonify({"message": "Resume not found"}), 404
 
 
 @app.route('/api/download_resume/<resume_id>', methods=['GET'])
 def download_resume_file(resume_id):
-    if resume_id not in resumes_db:
+    resume_data = resumes_db.get(resume_id)
+    if not resume_data:
         return jsonify({"message": "Resume not found"}), 404
 
-    resume_data = resumes_db[resume_id]
     unique_filename_on_server = resume_data['filepath']
     original_filename = resume_data['filename']
 
@@ -547,10 +643,13 @@ def download_all_filtered_resumes():
     if not filtered_resume_ids:
         return jsonify({"message": "No filtered resumes to download."}), 404
 
+    with session_data_lock:
+        filtered_results = {resume_id: screening_results_db.get(resume_id) for resume_id in filtered_resume_ids}
+
     memory_file = BytesIO()
     with zipfile.ZipFile(memory_file, 'w', zipfile.ZIP_DEFLATED) as zf:
         for resume_id in filtered_resume_ids:
-            result = screening_results_db.get(resume_id)
+            result = filtered_results.get(resume_id)
             if result:
                 unique_filename_on_server = result.get('filepath')
                 original_filename = result.get('filename')
@@ -579,13 +678,23 @@ def download_all_filtered_resumes():
 
 @app.route('/api/clear_session_data', methods=['POST'])
 def clear_session_data():
-    global resumes_db, screening_results_db, job_requirements_db
-    resumes_db = {}
-    screening_results_db = {}
-    job_requirements_db = {}
+    with session_data_lock:
+        resumes_db.clear()
+        screening_results_db.clear()
+        job_requirements_db.clear()
     print("Backend session data cleared.")
     return jsonify({"message": "Session data cleared successfully"}), 200
 
+# Load-testing endpoint that simulates an I/O-bound request (e.g. a Supabase round-trip)
+# by waiting without using CPU. Only registered when ENABLE_LOAD_TEST_ENDPOINT=true; used by
+# load_test.py to compare the sync gunicorn and async (asgi.py) deployments.
+if os.environ.get("ENABLE_LOAD_TEST_ENDPOINT", "false").lower() == "true":
+    @app.route('/api/load_test/io_wait', methods=['GET'])
+    def load_test_io_wait():
+        delay_ms = min(request.args.get('ms', 100, type=int), 5000)
+        time.sleep(delay_ms / 1000)
+        return jsonify({"message": "ok", "waited_ms": delay_ms}), 200
+
 # Catch-all route for email verification success (from previous context)
 @app.route('/success')
 def email_verified_success():
@@ -0,0 +1,36 @@
+# asgi.py
+# Async serving mode: runs the Flask app behind an ASGI server so a request waiting
+# on Supabase, SMTP or a file transfer only holds a cheap thread instead of a whole
+# sync gunicorn worker process.
+#
+#   uvicorn asgi:asgi_app --host 0.0.0.0 --port $PORT
+#   gunicorn asgi:asgi_app -k uvicorn.workers.UvicornWorker --bind 0.0.0.0:$PORT
+#
+# The views themselves stay synchronous (the Supabase client is sync); the event loop
+# handles connections and hands each request to a bounded thread pool. CPU-bound
+# scoring can be moved further out to processes with SCORING_PROCESSES (see app.py).
+import asyncio
+import os
+
+from a2wsgi import WSGIMiddleware
+
+from app import app, shutdown_executors
+
+ASGI_THREADS = int(os.environ.get("ASGI_THREADS", 32))  # concurrent requests per server process
+
+_wsgi_app = WSGIMiddleware(app, workers=ASGI_THREADS)
+
+
+async def asgi_app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                # Waits for queued OTP emails; keep that off the event loop
+                await asyncio.to_thread(shutdown_executors)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+    else:
+        await _wsgi_app(scope, receive, send)
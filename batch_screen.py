@@ -0,0 +1,264 @@
+# batch_screen.py
+# Offline batch screening of a resume archive against one or more job descriptions.
+#
+# Usage:
+#   python batch_screen.py RESUME_DIR --jobs jobs.json --output scores.csv [--workers 8]
+#
+# jobs.json holds a list of job requirements shaped like the /api/job_requirements payload:
+#   [{"job_id": "backend-dev", "job_description": "...", "skills": ["python", "sql"], "department": "Engineering"}]
+#
+# Results are appended to the CSV as each resume finishes, so an interrupted run can be
+# re-started with the same command and picks up where it left off. Pass --parquet to also
+# write a columnar copy once the run completes (requires pyarrow).
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from extraction_worker import ExtractionWorker, STATUS_OK
+from text_processor import preprocess_text, extract_skills_from_text
+from resume_matcher import calculate_match_score
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx')
+OUTPUT_COLUMNS = ['filepath', 'filename', 'job_id', 'match_score', 'matched_skills',
+                  'extracted_skills', 'status', 'error']
+
+# Per-process state, set up once by _init_worker instead of being pickled with every task
+_jobs = []
+_extraction_worker = None
+
+
+def load_jobs(jobs_path):
+    with open(jobs_path, 'r', encoding='utf-8') as f:
+        jobs = json.load(f)
+    if isinstance(jobs, dict):
+        jobs = [jobs]
+    seen_job_ids = set()
+    for index, job in enumerate(jobs):
+        if not job.get('job_description') or not job.get('skills'):
+            raise ValueError(f"Job #{index} in {jobs_path} needs a job_description and skills")
+        # Stored as text so it compares equal to the job_id read back from the CSV checkpoint
+        job['job_id'] = str(job.get('job_id', f"job-{index}"))
+        if job['job_id'] in seen_job_ids:
+            raise ValueError(f"Duplicate job_id {job['job_id']!r} in {jobs_path}")
+        seen_job_ids.add(job['job_id'])
+    return jobs
+
+
+def find_resumes(resume_dir):
+    for root, _, filenames in os.walk(resume_dir):
+        for filename in sorted(filenames):
+            if filename.lower().endswith(SUPPORTED_EXTENSIONS):
+                yield os.path.join(root, filename)
+
+
+def trim_partial_row(output_path):
+    # A crash mid-write can leave the last row without its line ending. Cut the file back to
+    # the last newline so the next run appends on a fresh line instead of gluing onto it.
+    # Rows never contain embedded newlines (see _failed_rows), so the last \n ends a full row.
+    if not os.path.exists(output_path):
+        return
+    with open(output_path, 'rb+') as f:
+        end = f.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            chunk_start = max(0, position - 4096)
+            f.seek(chunk_start)
+            chunk = f.read(position - chunk_start)
+            newline = chunk.rfind(b'\n')
+            if newline != -1:
+                position = chunk_start + newline + 1
+                break
+            position = chunk_start
+        if position != end:
+            f.truncate(position)
+
+
+def load_completed(output_path):
+    # Maps filepath -> job_ids that already have a complete row in an existing output file
+    completed = {}
+    if not os.path.exists(output_path):
+        return completed
+    with open(output_path, 'r', newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            if row.get('error') is not None:  # None means the row was cut off mid-write
+                completed.setdefault(row['filepath'], set()).add(row['job_id'])
+    return completed
+
+
+def _init_worker(jobs):
+    global _jobs, _extraction_worker
+    _jobs = jobs
+    _extraction_worker = ExtractionWorker()
+
+
+def _failed_rows(filepath, jobs, status, error):
+    return [{
+        'filepath': filepath,
+        'filename': os.path.basename(filepath),
+        'job_id': job['job_id'],
+        'match_score': '',
+        'matched_skills': '',
+        'extracted_skills': '',
+        'status': status,
+        # Kept on one line so every CSV row ends at the first newline after it
+        'error': (error or '').replace('\r', ' ').replace('\n', ' ')
+    } for job in jobs]
+
+
+def screen_resume(filepath, job_ids):
+    # Extract and preprocess once, then score the resume against each job still missing a row
+    jobs = [job for job in _jobs if job['job_id'] in job_ids]
+    extraction = _extraction_worker.extract(filepath)
+    if extraction['status'] != STATUS_OK:
+        return filepath, _failed_rows(filepath, jobs, extraction['status'], extraction['error'])
+
+    try:
+        processed_text = preprocess_text(extraction['text'])
+        extracted_skills = extract_skills_from_text(processed_text)
+
+        rows = []
+        for job in jobs:
+            match_score, matched_skills = calculate_match_score(
+                job['job_description'],
+                job['skills'],
+                processed_text,
+                extracted_skills
+            )
+
+            # Same department boost as /api/screen_resumes
+            department = job.get('department')
+            if department and department.lower() in processed_text.lower():
+                match_score *= 1.05
+
+            rows.append({
+                'filepath': filepath,
+                'filename': os.path.basename(filepath),
+                'job_id': job['job_id'],
+                'match_score': min(int(match_score), 100),
+                'matched_skills': ';'.join(matched_skills),
+                'extracted_skills': ';'.join(extracted_skills),
+                'status': STATUS_OK,
+                'error': ''
+            })
+        return filepath, rows
+    except Exception as e:
+        return filepath, _failed_rows(filepath, jobs, 'error', f"{type(e).__name__}: {e}")
+
+
+def write_parquet(csv_path, parquet_path):
+    try:
+        import pyarrow.csv as pa_csv
+        import pyarrow.parquet as pq
+    except ImportError:
+        print("pyarrow is not installed; skipping Parquet output.")
+        return
+    table = pa_csv.read_csv(csv_path)
+    pq.write_table(table, parquet_path)
+    print(f"Wrote {table.num_rows} rows to {parquet_path}")
+
+
+def run(resume_dir, jobs_path, output_path, workers=None, parquet_path=None, report_every=100):
+    jobs = load_jobs(jobs_path)
+    job_ids = {job['job_id'] for job in jobs}
+    trim_partial_row(output_path)
+    completed = load_completed(output_path)
+
+    # A resume is only skipped once every current job has a row for it; partially written
+    # resumes and jobs added to jobs.json since the last run are (re)scored
+    pending = []
+    already_done = 0
+    for path in find_resumes(resume_dir):
+        missing_job_ids = job_ids - completed.get(path, set())
+        if missing_job_ids:
+            pending.append((path, missing_job_ids))
+        else:
+            already_done += 1
+    print(f"{len(pending)} resumes to screen against {len(jobs)} job(s) "
+          f"({already_done} already done in {output_path})")
+
+    write_header = not os.path.exists(output_path) or os.path.getsize(output_path) == 0
+    processed = 0
+    failed = 0
+    start = time.perf_counter()
+
+    # Only keep a small window of files queued, so an interrupt doesn't have to wait
+    # for (or throw away) the rest of the archive
+    window = 2 * (workers or os.cpu_count() or 1)
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(jobs,))
+    try:
+        with open(output_path, 'a', newline='', encoding='utf-8') as out:
+            writer = csv.DictWriter(out, fieldnames=OUTPUT_COLUMNS)
+            if write_header:
+                writer.writeheader()
+
+            remaining = iter(pending)
+            in_flight = set()
+            while True:
+                for path, missing_job_ids in remaining:
+                    in_flight.add(executor.submit(screen_resume, path, missing_job_ids))
+                    if len(in_flight) >= window:
+                        break
+                if not in_flight:
+                    break
+
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    filepath, rows = future.result()
+                    writer.writerows(rows)
+                    out.flush()  # each finished resume is a checkpoint
+
+                    processed += 1
+                    if rows and rows[0]['status'] != STATUS_OK:
+                        failed += 1
+                    if processed % report_every == 0 or processed == len(pending):
+                        elapsed = time.perf_counter() - start
+                        print(f"{processed}/{len(pending)} resumes, {failed} failed, "
+                              f"{processed / elapsed:.1f} resumes/sec")
+    except KeyboardInterrupt:
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    executor.shutdown()
+
+    elapsed = time.perf_counter() - start
+    if processed:
+        print(f"Screened {processed} resumes in {elapsed:.1f}s ({processed / elapsed:.1f} resumes/sec)")
+
+    if parquet_path:
+        write_parquet(output_path, parquet_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Screen a directory of resumes against job descriptions.")
+    parser.add_argument('resume_dir', help="Directory searched recursively for .pdf and .docx resumes")
+    parser.add_argument('--jobs', required=True, help="JSON file with a list of job requirements")
+    parser.add_argument('--output', default='screening_results.csv',
+                        help="CSV file to write (and resume from if it already exists)")
+    parser.add_argument('--parquet', help="Also write the results to this Parquet file when done")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Number of parallel processes (default: CPU count)")
+    parser.add_argument('--report-every', type=int, default=100,
+                        help="Print throughput every N resumes")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.resume_dir):
+        parser.error(f"{args.resume_dir} is not a directory")
+    try:
+        load_jobs(args.jobs)  # validate up front so a bad jobs file is a usage error, not a traceback
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    try:
+        run(args.resume_dir, args.jobs, args.output, workers=args.workers,
+            parquet_path=args.parquet, report_every=args.report_every)
+    except KeyboardInterrupt:
+        print("Interrupted; re-run the same command to continue from the checkpoint.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+# benchmark_docx.py
+# Compares the streaming DOCX extractor against the python-docx path.
+# Usage: python benchmark_docx.py [file.docx ...]
+# With no arguments a synthetic resume-like document is generated and used.
+#
+# Memory is reported two ways: the peak RSS growth of a fresh process running one
+# extraction (includes lxml/libxml2 allocations made by python-docx), and the peak
+# Python heap seen by tracemalloc (which misses those C-level allocations).
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+
+from text_extractor import extract_text_from_docx_xml, extract_text_from_docx_python_docx
+
+CONTENT_TYPES_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>'
+)
+
+RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    '</Relationships>'
+)
+
+
+def build_synthetic_docx(path, paragraphs=5000, table_rows=500):
+    para = '<w:p><w:r><w:t>Experienced engineer working with Python, SQL and Docker on project {0}.</w:t></w:r></w:p>'
+    row = ('<w:tr><w:tc><w:p><w:r><w:t>Skill {0}</w:t></w:r></w:p></w:tc>'
+           '<w:tc><w:p><w:r><w:t>Kubernetes, AWS, Machine Learning</w:t></w:r></w:p></w:tc></w:tr>')
+    body = "".join(para.format(i) for i in range(paragraphs))
+    body += '<w:tbl>' + "".join(row.format(i) for i in range(table_rows)) + '</w:tbl>'
+    document_xml = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f'<w:body>{body}</w:body></w:document>'
+    )
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr('[Content_Types].xml', CONTENT_TYPES_XML)
+        zf.writestr('_rels/.rels', RELS_XML)
+        zf.writestr('word/document.xml', document_xml)
+
+
+EXTRACTORS = {
+    "python-docx": extract_text_from_docx_python_docx,
+    "iterparse": extract_text_from_docx_xml
+}
+
+
+def _max_rss_bytes():
+    # On Linux ru_maxrss survives fork+exec (a child starts at its parent's peak), so the
+    # per-process VmHWM from /proc is used instead where it exists
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+
+def _rss_child(name, path):
+    # Runs in a fresh interpreter: everything is already imported, so the peak RSS growth
+    # from here on is what this one extraction needed
+    baseline = _max_rss_bytes()
+    EXTRACTORS[name](path)
+    print(json.dumps({'rss_growth': _max_rss_bytes() - baseline}))
+
+
+def measure_rss(name, path):
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--rss-child', name, path],
+        check=True, capture_output=True, text=True
+    ).stdout
+    # The last line is the JSON result; extractors may print warnings before it
+    return json.loads(output.strip().splitlines()[-1])['rss_growth']
+
+
+def measure(extract, path, repeat):
+    # Time is measured without tracemalloc running, since it slows allocation-heavy code a lot
+    start = time.perf_counter()
+    for _ in range(repeat):
+        text = extract(path)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    extract(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed / repeat, peak, len(text)
+
+
+def main(paths, repeat=5):
+    for path in paths:
+        size_kb = os.path.getsize(path) / 1024
+        print(f"{os.path.basename(path)} ({size_kb:.1f} KB)")
+        for name, extract in EXTRACTORS.items():
+            seconds, peak, chars = measure(extract, path, repeat)
+            rss_growth = measure_rss(name, path)
+            print(f"  {name:<12} {seconds * 1000:8.1f} ms/file  {1 / seconds:7.1f} files/s  "
+                  f"RSS +{rss_growth / 1024 / 1024:6.1f} MB  "
+                  f"py heap {peak / 1024 / 1024:6.1f} MB  {chars} chars")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == '--rss-child':
+        _rss_child(sys.argv[2], sys.argv[3])
+    elif len(sys.argv) > 1:
+        main(sys.argv[1:])
+    else:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            synthetic_path = os.path.join(tmp_dir, 'synthetic_resume.docx')
+            build_synthetic_docx(synthetic_path)
+            main([synthetic_path])
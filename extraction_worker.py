@@ -0,0 +1,266 @@
+# extraction_worker.py
+# Runs text extraction in separate worker processes so a malformed or hostile
+# PDF/DOCX can only take down (and get recycled with) its own worker, never the
+# web worker serving requests.
+#
+# Each worker is a fresh interpreter running this file, not a fork of the caller, so its
+# memory limit only has to cover extraction itself and not whatever the parent process
+# (numpy, sklearn, nltk, a threaded web server, ...) already has mapped.
+import atexit
+import os
+import queue
+import signal
+import subprocess
+import sys
+import threading
+import time
+from multiprocessing.connection import Connection
+
+try:
+    import resource  # POSIX only; limits are skipped where it is unavailable
+except ImportError:
+    resource = None
+
+# --- Configuration (override via environment variables) ---
+EXTRACTION_TIMEOUT = float(os.environ.get("EXTRACTION_TIMEOUT", 30))  # wall-clock seconds per file
+EXTRACTION_CPU_SECONDS = int(os.environ.get("EXTRACTION_CPU_SECONDS", 20))  # CPU seconds per file
+EXTRACTION_MEMORY_MB = int(os.environ.get("EXTRACTION_MEMORY_MB", 512))  # address space per worker
+EXTRACTION_MAX_FILES_PER_WORKER = int(os.environ.get("EXTRACTION_MAX_FILES_PER_WORKER", 50))
+EXTRACTION_WORKERS = int(os.environ.get("EXTRACTION_WORKERS", 2))
+
+# Result statuses reported back to callers
+STATUS_OK = "ok"
+STATUS_ERROR = "error"
+STATUS_TIMEOUT = "timeout"
+STATUS_CPU_LIMIT = "cpu_limit"
+STATUS_MEMORY_LIMIT = "memory_limit"
+STATUS_CRASHED = "crashed"
+
+
+def _make_result(filepath, status, text="", error=None, elapsed=0.0):
+    return {
+        'filepath': filepath,
+        'status': status,
+        'text': text,
+        'error': error,
+        'elapsed': elapsed
+    }
+
+
+def _cpu_time_used():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _set_cpu_budget(cpu_seconds):
+    # RLIMIT_CPU counts total process CPU time, so the soft limit is moved forward
+    # before every file. Exceeding it delivers SIGXCPU, which kills the worker.
+    if resource is None or not cpu_seconds:
+        return
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    soft = int(_cpu_time_used()) + cpu_seconds
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def _set_memory_limit(memory_mb):
+    if resource is None or not memory_mb:
+        return
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    soft = memory_mb * 1024 * 1024
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (soft, hard))
+
+
+def _worker_main(cpu_seconds, memory_mb):
+    # Child process loop: receive a file path on stdin, send back a result dict on
+    # stdout, repeat. Ctrl+C is handled by the parent, which shuts workers down itself.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    recv_conn = Connection(os.dup(0), writable=False)
+    send_conn = Connection(os.dup(1), readable=False)
+    # Anything the extractors print goes to stderr so it can't corrupt the result stream
+    os.dup2(2, 1)
+    sys.stdout = sys.stderr
+
+    _set_memory_limit(memory_mb)
+    from text_extractor import extract_text_from_file
+
+    while True:
+        try:
+            filepath = recv_conn.recv()
+        except (EOFError, OSError):
+            break
+        if filepath is None:
+            break
+
+        _set_cpu_budget(cpu_seconds)
+        start = time.perf_counter()
+        try:
+            text = extract_text_from_file(filepath, strict=True)
+            result = _make_result(filepath, STATUS_OK, text=text)
+        except MemoryError:
+            result = _make_result(filepath, STATUS_MEMORY_LIMIT,
+                                  error=f"Exceeded memory limit of {memory_mb} MB")
+        except Exception as e:
+            result = _make_result(filepath, STATUS_ERROR, error=f"{type(e).__name__}: {e}")
+        result['elapsed'] = time.perf_counter() - start
+
+        try:
+            send_conn.send(result)
+        except (EOFError, OSError):
+            break
+        if result['status'] == STATUS_MEMORY_LIMIT:
+            # The heap may be fragmented or half-full; let the parent start a fresh worker
+            break
+    recv_conn.close()
+    send_conn.close()
+
+
+class ExtractionWorker:
+    """A single extraction subprocess, restarted after a failure or every `max_files` files."""
+
+    def __init__(self, timeout=EXTRACTION_TIMEOUT, cpu_seconds=EXTRACTION_CPU_SECONDS,
+                 memory_mb=EXTRACTION_MEMORY_MB, max_files=EXTRACTION_MAX_FILES_PER_WORKER):
+        self.timeout = timeout
+        self.cpu_seconds = cpu_seconds
+        self.memory_mb = memory_mb
+        self.max_files = max_files
+        self._process = None
+        self._send_conn = None
+        self._recv_conn = None
+        self._files_handled = 0
+
+    def _start(self):
+        self._process = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), str(self.cpu_seconds), str(self.memory_mb)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE
+        )
+        # Talk to the worker over its stdin/stdout pipes with multiprocessing's message framing
+        self._send_conn = Connection(os.dup(self._process.stdin.fileno()), readable=False)
+        self._recv_conn = Connection(os.dup(self._process.stdout.fileno()), writable=False)
+        self._process.stdin.close()
+        self._process.stdout.close()
+        self._files_handled = 0
+
+    def _is_alive(self):
+        return self._process is not None and self._process.poll() is None
+
+    def _kill(self):
+        if self._process is not None:
+            if self._process.poll() is None:
+                self._process.kill()
+            self._process.wait()
+        for conn in (self._send_conn, self._recv_conn):
+            if conn is not None:
+                conn.close()
+        self._process = None
+        self._send_conn = None
+        self._recv_conn = None
+
+    def close(self):
+        if self._is_alive():
+            try:
+                self._send_conn.send(None)
+                self._process.wait(1)
+            except (EOFError, OSError, subprocess.TimeoutExpired):
+                pass
+        self._kill()
+
+    def _needs_restart(self):
+        return (not self._is_alive()
+                or (self.max_files and self._files_handled >= self.max_files))
+
+    def extract(self, filepath):
+        if self._needs_restart():
+            self._kill()
+            self._start()
+
+        start = time.perf_counter()
+        try:
+            self._send_conn.send(filepath)
+            ready = self._recv_conn.poll(self.timeout)
+        except (EOFError, OSError) as e:
+            self._kill()
+            return _make_result(filepath, STATUS_CRASHED, error=f"Worker unavailable: {e}",
+                                elapsed=time.perf_counter() - start)
+
+        if not ready:
+            self._kill()
+            return _make_result(filepath, STATUS_TIMEOUT,
+                                error=f"Extraction exceeded {self.timeout} seconds",
+                                elapsed=time.perf_counter() - start)
+
+        try:
+            result = self._recv_conn.recv()
+        except (EOFError, OSError):
+            # The worker died mid-file; the exit code tells us which limit it hit
+            exitcode = self._process.wait()
+            self._kill()
+            elapsed = time.perf_counter() - start
+            if hasattr(signal, 'SIGXCPU') and exitcode == -signal.SIGXCPU:
+                return _make_result(filepath, STATUS_CPU_LIMIT,
+                                    error=f"Exceeded CPU limit of {self.cpu_seconds} seconds",
+                                    elapsed=elapsed)
+            return _make_result(filepath, STATUS_CRASHED,
+                                error=f"Worker exited with code {exitcode}", elapsed=elapsed)
+
+        self._files_handled += 1
+        if result['status'] == STATUS_MEMORY_LIMIT:
+            # The worker exits after a MemoryError; reap it now so the next file gets a fresh one
+            self._kill()
+        return result
+
+
+class ExtractionWorkerPool:
+    """Fixed set of ExtractionWorkers shared safely between request threads."""
+
+    def __init__(self, size=EXTRACTION_WORKERS, **worker_options):
+        self._workers = [ExtractionWorker(**worker_options) for _ in range(size)]
+        self._idle = queue.Queue()
+        for worker in self._workers:
+            self._idle.put(worker)
+
+    def extract(self, filepath):
+        worker = self._idle.get()
+        try:
+            return worker.extract(filepath)
+        finally:
+            self._idle.put(worker)
+
+    def close(self):
+        for worker in self._workers:
+            worker.close()
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def get_extraction_pool():
+    # Created lazily so importing this module does not spawn processes
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = ExtractionWorkerPool()
+            atexit.register(_default_pool.close)
+    return _default_pool
+
+
+def extract_text_isolated(filepath):
+    """Extract text from `filepath` in a sandboxed worker.
+
+    Returns a result dict with keys: filepath, status, text, error, elapsed.
+    `status` is one of "ok", "error", "timeout", "cpu_limit", "memory_limit" or "crashed";
+    `text` is "" for anything but "ok".
+    """
+    result = get_extraction_pool().extract(filepath)
+    if result['status'] != STATUS_OK:
+        print(f"Isolated extraction failed for {filepath}: {result['status']} ({result['error']})")
+    return result
+
+
+if __name__ == "__main__":
+    _worker_main(int(sys.argv[1]), int(sys.argv[2]))
@@ -0,0 +1,90 @@
+# load_test.py
+# Concurrent-request load test for comparing the sync gunicorn deployment with the
+# async serving mode (asgi.py). Start both servers with the load-test endpoint enabled,
+# then point this at each of them:
+#
+#   ENABLE_LOAD_TEST_ENDPOINT=true gunicorn app:app --bind 0.0.0.0:8001
+#   ENABLE_LOAD_TEST_ENDPOINT=true uvicorn asgi:asgi_app --host 0.0.0.0 --port 8002
+#   python load_test.py http://localhost:8001 http://localhost:8002
+#
+# The default path, /api/load_test/io_wait, waits ?ms= milliseconds without using CPU, like
+# a view blocked on Supabase or SMTP, which is where the two deployments differ.
+#
+# POST endpoints can be exercised with --method POST --data '{"email": "..."}'. Remember the
+# auth endpoints are rate limited; set RATE_LIMIT_ENABLED=false on the servers under test.
+import argparse
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+
+
+def _worker(url, method, data, deadline, latencies, errors, lock):
+    body = data.encode('utf-8') if data else None
+    headers = {'Content-Type': 'application/json'} if data else {}
+    while time.perf_counter() < deadline:
+        req = urllib.request.Request(url, data=body, headers=headers, method=method)
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(req, timeout=30) as response:
+                response.read()
+            ok = True
+        except urllib.error.HTTPError as e:
+            # 4xx answers still measure server throughput; 5xx count as failures
+            e.read()
+            ok = e.code < 500
+        except Exception:
+            ok = False
+        elapsed = time.perf_counter() - start
+        with lock:
+            if ok:
+                latencies.append(elapsed)
+            else:
+                errors.append(elapsed)
+
+
+def run_load(url, concurrency, duration, method='GET', data=None):
+    latencies, errors = [], []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+    threads = [threading.Thread(target=_worker, args=(url, method, data, deadline, latencies, errors, lock))
+               for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    result = {'requests': len(latencies), 'errors': len(errors), 'rps': len(latencies) / elapsed}
+    if latencies:
+        latencies.sort()
+        result['p50_ms'] = statistics.median(latencies) * 1000
+        result['p95_ms'] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000
+    else:
+        result['p50_ms'] = result['p95_ms'] = float('nan')
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare concurrent-request throughput between deployments.")
+    parser.add_argument('base_urls', nargs='+', help="Server base URLs, e.g. http://localhost:8001")
+    parser.add_argument('--path', default='/api/load_test/io_wait?ms=100')
+    parser.add_argument('--method', default='GET')
+    parser.add_argument('--data', help="JSON request body")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32, 64])
+    parser.add_argument('--duration', type=float, default=10, help="Seconds per run")
+    args = parser.parse_args()
+
+    print(f"{'server':<28} {'conc':>5} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'errors':>7}")
+    for base_url in args.base_urls:
+        url = base_url.rstrip('/') + args.path
+        for concurrency in args.concurrency:
+            r = run_load(url, concurrency, args.duration, args.method, args.data)
+            print(f"{base_url:<28} {concurrency:>5} {r['rps']:>9.1f} {r['p50_ms']:>9.1f} "
+                  f"{r['p95_ms']:>9.1f} {r['errors']:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+# password_hashing.py
+# Runs password hashing/verification (PBKDF2/scrypt, deliberately CPU-heavy) on a small
+# bounded thread pool shared by all request threads of one process.
+#
+# This only helps when a process serves many requests concurrently, i.e. the threaded
+# async serving mode (asgi.py): there it caps how many hashes run at once per process and
+# rejects bursts beyond the queue with HashingBusyError instead of letting every request
+# thread hash in parallel. Under the sync gunicorn workers in the Procfile each worker
+# handles one request at a time, so the pool never holds more than one job and limits
+# nothing across workers; the per-IP/email rate limits are what protect that deployment.
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from werkzeug.security import generate_password_hash, check_password_hash
+
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", 2))
+PASSWORD_HASH_QUEUE = int(os.environ.get("PASSWORD_HASH_QUEUE", 16))  # waiting jobs allowed beyond the workers
+PASSWORD_HASH_TIMEOUT = float(os.environ.get("PASSWORD_HASH_TIMEOUT", 10))
+
+
+class HashingBusyError(Exception):
+    """Raised when the hashing pool is saturated or a hash does not finish in time."""
+
+
+_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+_slots = threading.BoundedSemaphore(PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE)
+
+
+def _run(func, *args):
+    if not _slots.acquire(blocking=False):
+        raise HashingBusyError("Password hashing queue is full")
+    try:
+        future = _executor.submit(func, *args)
+    except Exception:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+    try:
+        return future.result(timeout=PASSWORD_HASH_TIMEOUT)
+    except FutureTimeoutError:
+        raise HashingBusyError("Password hashing timed out")
+
+
+def hash_password(password):
+    return _run(generate_password_hash, password)
+
+
+def verify_password(password_hash, password):
+    return _run(check_password_hash, password_hash, password)
@@ -0,0 +1,148 @@
+# rate_limiter.py
+# Token-bucket rate limiting for the auth endpoints, keyed per client IP and per email.
+#
+# Buckets live in process memory by default. Set RATE_LIMIT_REDIS_URL to share them
+# between gunicorn workers/instances (requires the optional `redis` package).
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import request, jsonify
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+RATE_LIMIT_REDIS_URL = os.environ.get("RATE_LIMIT_REDIS_URL")
+RATE_LIMIT_ENABLED = os.environ.get("RATE_LIMIT_ENABLED", "true").lower() != "false"
+MAX_IN_MEMORY_BUCKETS = 100000
+
+
+class InMemoryBackend:
+    def __init__(self, max_buckets=MAX_IN_MEMORY_BUCKETS):
+        # key -> (tokens, last_refill_timestamp), least recently used first
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_buckets = max_buckets
+
+    def consume(self, key, capacity, refill_per_second, cost=1):
+        """Take `cost` tokens from the bucket. Returns (allowed, retry_after_seconds)."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - last) * refill_per_second)
+            if tokens >= cost:
+                tokens -= cost
+                allowed, retry_after = True, 0.0
+            else:
+                allowed, retry_after = False, (cost - tokens) / refill_per_second
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            # Hard cap: evict the least recently used buckets in O(1) each
+            while len(self._buckets) > self._max_buckets:
+                self._buckets.popitem(last=False)
+        return allowed, retry_after
+
+
+class RedisBackend:
+    # Refill and consume atomically on the Redis server so concurrent workers see one bucket
+    _CONSUME_SCRIPT = """
+    local capacity = tonumber(ARGV[1])
+    local rate = tonumber(ARGV[2])
+    local cost = tonumber(ARGV[3])
+    local now = tonumber(ARGV[4])
+    local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+    local tokens = tonumber(bucket[1]) or capacity
+    local ts = tonumber(bucket[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    local allowed = 0
+    if tokens >= cost then
+        tokens = tokens - cost
+        allowed = 1
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+    redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+    return {allowed, tostring(tokens)}
+    """
+
+    def __init__(self, url):
+        self._client = redis.Redis.from_url(url)
+        self._consume = self._client.register_script(self._CONSUME_SCRIPT)
+
+    def consume(self, key, capacity, refill_per_second, cost=1):
+        allowed, tokens = self._consume(
+            keys=[f"ratelimit:{key}"],
+            args=[capacity, refill_per_second, cost, time.time()]
+        )
+        if allowed:
+            return True, 0.0
+        return False, (cost - float(tokens)) / refill_per_second
+
+
+def create_backend():
+    if RATE_LIMIT_REDIS_URL:
+        if redis is None:
+            print("WARNING: RATE_LIMIT_REDIS_URL is set but the redis package is not installed. "
+                  "Falling back to in-memory rate limiting.")
+        else:
+            try:
+                return RedisBackend(RATE_LIMIT_REDIS_URL)
+            except Exception as e:
+                print(f"Could not connect to Redis for rate limiting: {e}. Falling back to in-memory.")
+    return InMemoryBackend()
+
+
+backend = create_backend()
+
+
+def client_ip():
+    # app.py wraps the app in ProxyFix (TRUSTED_PROXY_HOPS), so remote_addr is already
+    # the client address as seen by the outermost trusted proxy
+    return request.remote_addr or "unknown"
+
+
+def request_email():
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        # Missing, malformed or non-object JSON (e.g. a list) has no email to key on
+        return None
+    email = data.get('email')
+    return email.strip().lower() if isinstance(email, str) and email.strip() else None
+
+
+def rate_limit(name, capacity, per_seconds, key_funcs=(client_ip, request_email)):
+    """Allow `capacity` requests per `per_seconds` for each identity returned by `key_funcs`.
+
+    Every key function gets its own bucket (e.g. one per IP and one per email); the request
+    is rejected with 429 as soon as any of them is empty. Key functions returning None are skipped.
+    """
+    refill_per_second = capacity / per_seconds
+
+    def decorator(view):
+        @wraps(view)
+        def wrapped(*args, **kwargs):
+            if not RATE_LIMIT_ENABLED:
+                return view(*args, **kwargs)
+
+            for key_func in key_funcs:
+                identity = key_func()
+                if identity is None:
+                    continue
+                key = f"{name}:{key_func.__name__}:{identity}"
+                try:
+                    allowed, retry_after = backend.consume(key, capacity, refill_per_second)
+                except Exception as e:
+                    # Fail open: a broken shared backend must not lock everyone out
+                    print(f"Rate limiter error for {key}: {e}")
+                    continue
+                if not allowed:
+                    response = jsonify({"message": "Too many requests. Please try again later."})
+                    response.headers['Retry-After'] = str(max(1, int(retry_after + 0.999)))
+                    return response, 429
+
+            return view(*args, **kwargs)
+        return wrapped
+    return decorator
@@ -1,34 +1,140 @@
 # text_extractor.py
 import os
+import zipfile
+import xml.etree.ElementTree as ET
 from PyPDF2 import PdfReader
 from docx import Document
 
-def extract_text_from_pdf(pdf_path):
+# WordprocessingML namespace used by every tag in word/document.xml
+W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+# Word stores text boxes twice: once as DrawingML in mc:Choice and again as VML in mc:Fallback
+MC_FALLBACK = '{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback'
+
+# The extract_* functions print errors and return "" by default. With strict=True they raise
+# instead, so callers such as extraction_worker can report what went wrong.
+
+def extract_text_from_pdf(pdf_path, strict=False):
     text = ""
     try:
         with open(pdf_path, 'rb') as file:
             reader = PdfReader(file)
             for page in reader.pages:
                 text += page.extract_text() or ""
+    except MemoryError:
+        # Let extraction workers report hitting their memory limit instead of returning ""
+        raise
     except Exception as e:
+        if strict:
+            raise
         print(f"Error extracting text from PDF {pdf_path}: {e}")
     return text
 
-def extract_text_from_docx(docx_path):
+def extract_text_from_docx_xml(docx_path):
+    # Streams word/document.xml straight out of the zip with iterparse instead of
+    # building the full python-docx object model. Table rows are emitted as one
+    # line each with cells separated by tabs, since many resumes keep skills in tables.
+    # Raises on malformed files; extract_text_from_docx handles the fallback.
+    lines = []
+    paragraphs = []  # stack of open paragraphs (lists of text pieces); text boxes nest them
+    rows = []        # stack of open table rows (lists of cell texts)
+    cells = []       # stack of open table cells (lists of paragraph texts)
+    body = None
+    fallback_depth = 0  # > 0 while inside mc:Fallback, whose content duplicates mc:Choice
+    tab_stops_depth = 0  # > 0 inside w:pPr/w:tabs, whose w:tab children are tab stop definitions
+
+    with zipfile.ZipFile(docx_path) as archive:
+        with archive.open('word/document.xml') as xml_file:
+            for event, elem in ET.iterparse(xml_file, events=('start', 'end')):
+                tag = elem.tag
+                if tag == MC_FALLBACK:
+                    fallback_depth += 1 if event == 'start' else -1
+                    continue
+                if fallback_depth:
+                    continue
+                if tag == W_NS + 'tabs':
+                    tab_stops_depth += 1 if event == 'start' else -1
+                    continue
+                if tab_stops_depth:
+                    continue
+
+                if event == 'start':
+                    if tag == W_NS + 'body':
+                        body = elem
+                    elif tag == W_NS + 'p':
+                        paragraphs.append([])
+                    elif tag == W_NS + 'tr':
+                        rows.append([])
+                    elif tag == W_NS + 'tc':
+                        cells.append([])
+                    continue
+
+                if tag == W_NS + 't':
+                    if paragraphs:
+                        paragraphs[-1].append(elem.text or "")
+                elif tag == W_NS + 'tab':
+                    if paragraphs:
+                        paragraphs[-1].append("\t")
+                elif tag in (W_NS + 'br', W_NS + 'cr'):
+                    if paragraphs:
+                        paragraphs[-1].append("\n")
+                elif tag == W_NS + 'p':
+                    paragraph = "".join(paragraphs.pop())
+                    if paragraphs:
+                        # Text box content is kept inline with the paragraph that anchors it
+                        paragraphs[-1].append(" " + paragraph)
+                    elif cells:
+                        cells[-1].append(paragraph)
+                    else:
+                        lines.append(paragraph)
+                elif tag == W_NS + 'tc':
+                    cell_text = " ".join(p for p in cells.pop() if p)
+                    if rows:
+                        rows[-1].append(cell_text)
+                elif tag == W_NS + 'tr':
+                    row_text = "\t".join(rows.pop())
+                    # Nested tables end up inside the enclosing cell
+                    if cells:
+                        cells[-1].append(row_text)
+                    else:
+                        lines.append(row_text)
+
+                # Drop finished top-level blocks so memory stays flat for large documents
+                if body is not None and not cells and not paragraphs and tag in (W_NS + 'p', W_NS + 'tbl'):
+                    body.clear()
+
+    return "\n".join(lines) + "\n" if lines else ""
+
+def extract_text_from_docx_python_docx(docx_path, strict=False):
+    # Original python-docx path (paragraphs only). Kept as a fallback for files
+    # the streaming parser cannot read and as the baseline in benchmark_docx.py.
     text = ""
     try:
         doc = Document(docx_path)
-        for paragraph in doc.paragraphs:
-            text += paragraph.text + "\n"
+        text = "".join(paragraph.text + "\n" for paragraph in doc.paragraphs)
+    except MemoryError:
+        raise
     except Exception as e:
+        if strict:
+            raise
         print(f"Error extracting text from DOCX {docx_path}: {e}")
     return text
 
-def extract_text_from_file(filepath):
+def extract_text_from_docx(docx_path, strict=False):
+    try:
+        return extract_text_from_docx_xml(docx_path)
+    except MemoryError:
+        raise
+    except Exception as e:
+        print(f"Fast DOCX extraction failed for {docx_path}, falling back to python-docx: {e}")
+        return extract_text_from_docx_python_docx(docx_path, strict=strict)
+
+def extract_text_from_file(filepath, strict=False):
     file_extension = os.path.splitext(filepath)[1].lower()
     if file_extension == '.pdf':
-        return extract_text_from_pdf(filepath)
+        return extract_text_from_pdf(filepath, strict=strict)
     elif file_extension == '.docx':
-        return extract_text_from_docx(filepath)
+        return extract_text_from_docx(filepath, strict=strict)
+    elif strict:
+        raise ValueError(f"Unsupported file type: {file_extension or 'none'}")
     else:
         return "" # Or raise an error for unsupported types